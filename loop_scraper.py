@@ -1,8 +1,15 @@
 import time
-import subprocess
+import traceback
 
+from padelv2 import install_shutdown_hooks, main
+
+install_shutdown_hooks()
 while True:
     print("🔁 Starting scrape...")
-    subprocess.run(["python", "padelv2.py"])
-    print("✅ Scrape complete. Sleeping for 24 hours...\n")
-    time.sleep(6 * 60 * 60)  # 24 hours
+    try:
+        main()
+    except Exception:
+        # Keep the loop alive like the old subprocess did when a run crashed
+        traceback.print_exc()
+    print("✅ Scrape complete. Sleeping for 6 hours...\n")
+    time.sleep(6 * 60 * 60)  # 6 hours
@@ -1,16 +1,34 @@
 import os
+import re
+import json
 import time
+import queue
+import signal
+import asyncio
+import atexit
+import threading
+import copy
 import uuid
+import shutil
+import tempfile
 import logging
 import argparse
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+import httpx
 from dotenv import load_dotenv
 from supabase import create_client
+from postgrest.utils import SyncClient
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from urllib3.exceptions import HTTPError as DriverConnectionError
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 
@@ -23,8 +41,98 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-def create_scrape_run():
-    scrape_id = str(uuid.uuid4())
+# Club inserts are often more than httpx's default 5s apart, so keep connections around longer
+POSTGREST_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60)
+
+def tune_postgrest_pool(client):
+    session = client.postgrest.session
+    # postgrest's own client subclass, so aclose() and the context manager keep working
+    client.postgrest.session = SyncClient(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=session.timeout,
+        limits=POSTGREST_LIMITS,
+    )
+    session.close()
+
+tune_postgrest_pool(supabase)
+
+# Clubs and courts rarely change, so cold starts reuse them from disk for a day
+CACHE_DIR = Path(os.getenv("PADEL_CACHE_DIR") or Path.home() / ".cache" / "padel")
+CACHE_TTL = 24 * 60 * 60
+
+BATCH_SIZE = 500
+PAGE_LOAD_TIMEOUT = 30
+# Postgres exclusion_violation, raised when a slot overlaps one already stored for its court
+EXCLUSION_VIOLATION = "23P01"
+# Both need a unique index on these columns
+SLOT_CONFLICT_COLUMNS = "court_id,booking_date,start_time"
+COURT_CONFLICT_COLUMNS = "club_id,name"
+# Each headless Chrome needs a few hundred MB, so keep the default small for shared workers
+MAX_BROWSERS = int(os.getenv("MAX_BROWSERS") or 2)
+MAX_PAGES_PER_DRIVER = 50
+# Errors that mean the Chrome session itself is gone or hung, as opposed to a bad page or a database hiccup
+BROKEN_SESSION_ERRORS = (WebDriverException, DriverConnectionError, ConnectionError)
+SCRAPE_ATTEMPTS = 2
+
+browser_executor = ThreadPoolExecutor(max_workers=MAX_BROWSERS, thread_name_prefix="browser")
+# Set CHROMEDRIVER_PATH to use a preinstalled driver and skip webdriver-manager entirely
+_chromedriver_path = os.getenv("CHROMEDRIVER_PATH")
+_chromedriver_lock = threading.Lock()
+# Set CHROME_PROFILE_DIR to a tmpfs (e.g. /dev/shm) to keep Chrome's profile and disk cache in memory.
+# Off by default because Docker's /dev/shm is only 64MB
+CHROME_PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR")
+
+# (club_id, court name) -> court id, kept for the life of the process
+_court_ids = {}
+
+COURT_ROW_SEL = "div.border-b"
+COURT_NAME_SEL = "div.font-medium"
+SLOT_SEL = "div[data-start-hour][data-end-hour]"
+COURT_ROW_LOCATOR = (By.CSS_SELECTOR, COURT_ROW_SEL)
+
+# Slot hours come as "H", "HH" or "HH:MM"
+HOUR_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?")
+
+SLOT_COUNT_JS = f"return document.querySelectorAll('{COURT_ROW_SEL} {SLOT_SEL}').length"
+
+# Only the DOM is read, so images, fonts and media are never needed
+BLOCKED_CONTENT_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+}
+# Stylesheets stay: court names are read with innerText, which honours CSS visibility and text-transform
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg",
+    "*.woff", "*.woff2", "*.ttf", "*.mp4",
+    "*googletagmanager*", "*google-analytics*", "*facebook*",
+]
+
+# Background features a one-page headless scrape never uses
+CHROME_LEAN_FLAGS = [
+    "--blink-settings=imagesEnabled=false",
+    "--no-first-run",
+    "--disable-default-apps",
+    "--disable-background-networking",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-translate",
+    "--metrics-recording-only",
+    "--mute-audio",
+]
+
+# Reads every court row in one round trip instead of one WebDriver call per element
+COURT_ROWS_JS = f"""
+return Array.from(document.querySelectorAll('{COURT_ROW_SEL}')).map((row, i) => {{
+    const name = row.querySelector('{COURT_NAME_SEL}');
+    return {{
+        name: name ? (name.innerText.trim() || 'Court ' + (i + 1)) : null,
+        hours: Array.from(row.querySelectorAll('{SLOT_SEL}'))
+            .map(el => [el.dataset.startHour, el.dataset.endHour])
+    }};
+}});
+"""
+
+def create_scrape_run(scrape_id, booking_date):
     now = datetime.now(timezone.utc).isoformat()
     payload = {
         "id": scrape_id,
@@ -32,114 +140,426 @@ def create_scrape_run():
         "start_time": now,
         "status": "running",
         "total_slots": 0,
-        "booking_date": datetime.now().date().isoformat()
+        "booking_date": booking_date
     }
     supabase.table("scrape_runs").insert(payload).execute()
     logger.info("Created scrape run %s", scrape_id)
-    return scrape_id
 
-def fetch_clubs():
-    res = supabase.table("clubs").select("id,name,url").execute()
-    return res.data if res.data else []
+def read_cache(name):
+    path = CACHE_DIR / name
+    try:
+        if time.time() - path.stat().st_mtime < CACHE_TTL:
+            return json.loads(path.read_text())
+    except (OSError, ValueError):
+        pass
+    return None
+
+def write_cache(name, data):
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        (CACHE_DIR / name).write_text(json.dumps(data))
+    except OSError as e:
+        logger.warning("Could not write %s cache: %s", name, e)
+
+def fetch_clubs(refresh=False):
+    cached = None if refresh else read_cache("clubs.json")
+    if cached is not None:
+        logger.info("Using cached club list")
+        return cached
+    # Courts are embedded through the courts.club_id foreign key, so this is one round trip
+    res = supabase.table("clubs").select("id,name,url,courts(id,name)").execute()
+    clubs = res.data if res.data else []
+    if clubs:
+        # An empty answer is more likely a key or RLS problem than no clubs, so don't keep it for a day
+        write_cache("clubs.json", clubs)
+    return clubs
+
+def to_minutes(hour):
+    match = HOUR_RE.fullmatch(hour or "")
+    if match is None:
+        return None
+    return int(match[1]) * 60 + int(match[2] or 0)
+
+def to_interval(start, end):
+    start_min = to_minutes(start)
+    end_min = to_minutes(end)
+    if start_min is None or end_min is None:
+        return None
+    if end_min <= start_min:
+        # The slot runs past midnight
+        end_min += 24 * 60
+    return start_min, end_min
+
+def cache_courts(clubs):
+    count = 0
+    for club in clubs:
+        for court in club.get("courts") or []:
+            _court_ids[(club["id"], court["name"])] = court["id"]
+            count += 1
+    logger.info("Cached %d courts", count)
+
+def format_minutes(minutes):
+    return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}:00"
+
+def merge_intervals(intervals):
+    # Touching or overlapping free slots on one court become a single row
+    merged = []
+    for start, end in sorted(set(intervals)):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def ensure_courts_exist(club_id, court_names):
+    names = list(dict.fromkeys(court_names))
+    unknown = [name for name in names if (club_id, name) not in _court_ids]
+    if unknown:
+        # Names missing from the prefetched cache are almost always new courts, so insert first;
+        # rows that already existed come back empty and are looked up afterwards
+        created = supabase.table("courts").upsert(
+            [{"id": str(uuid.uuid4()), "club_id": club_id, "name": name} for name in unknown],
+            on_conflict=COURT_CONFLICT_COLUMNS,
+            ignore_duplicates=True,
+        ).execute()
+        for row in created.data or []:
+            _court_ids[(club_id, row["name"])] = row["id"]
+        existing = [name for name in unknown if (club_id, name) not in _court_ids]
+        if existing:
+            query = supabase.table("courts").select("id,name").eq("club_id", club_id).in_("name", existing).execute()
+            for row in query.data or []:
+                _court_ids[(club_id, row["name"])] = row["id"]
+    return {name: _court_ids[(club_id, name)] for name in names}
 
-def ensure_court_exists(club_id, court_name):
-    query = supabase.table("courts").select("id").eq("club_id", club_id).eq("name", court_name).execute()
-    if query.data:
-        return query.data[0]["id"]
-    court_id = str(uuid.uuid4())
-    supabase.table("courts").insert({"id": court_id, "club_id": club_id, "name": court_name}).execute()
-    return court_id
+def upsert_slots(rows):
+    # Slots seen by an earlier run are updated in place and tagged with this run's scrape_id
+    # A minimal return has no body to count, and a failed batch raises, so every row was written
+    supabase.table("slots").upsert(
+        rows,
+        on_conflict=SLOT_CONFLICT_COLUMNS,
+        returning="minimal",
+    ).execute()
+    return len(rows)
 
-def insert_slots(slots, booking_date):
+def is_overlap_error(e):
+    # Fall back to Postgres' message for errors that don't carry the PostgREST error code
+    return getattr(e, "code", None) == EXCLUSION_VIOLATION or "violates exclusion constraint" in str(e)
+
+def insert_batch(batch, overlapping):
+    try:
+        return upsert_slots(batch)
+    except Exception as e:
+        if not is_overlap_error(e):
+            raise
+        if len(batch) == 1:
+            overlapping.append(batch[0])
+            return 0
+    # Bisect so only the overlapping rows get set aside, in O(log n) calls per bad row
+    middle = len(batch) // 2
+    return insert_batch(batch[:middle], overlapping) + insert_batch(batch[middle:], overlapping)
+
+def insert_slots(slots):
+    written = 0
+    overlapping = []
+    complete = True
+    rows = iter(slots)
+    while batch := list(islice(rows, BATCH_SIZE)):
+        try:
+            written += insert_batch(batch, overlapping)
+        except Exception as e:
+            logger.error("Bulk insert failed: %s", e)
+            complete = False
+    return written, overlapping, complete
+
+def delete_stale_slots(court_ids, scrape_id, booking_date):
+    (supabase.table("slots").delete(returning="minimal")
+        .eq("booking_date", booking_date)
+        .neq("scrape_id", scrape_id)
+        .in_("court_id", court_ids)
+        .execute())
+
+def store_club_slots(club, slots, court_ids, scrape_id, booking_date):
     if not slots:
-        logger.warning("No slots to insert")
-        return
+        # An empty grid is far more often a slow or broken page than a fully booked club
+        logger.warning("No slots read for %s, keeping earlier ones", club["name"])
+        return 0
+    written, overlapping, complete = insert_slots(slots)
+    if not complete:
+        # Some of today's slots were not rewritten, so keep the previous rows rather than lose them
+        logger.warning("Keeping earlier slots for %s because some batches failed", club["name"])
+        return written
+
     try:
-        supabase.table("slots").insert(slots).execute()
-        logger.info("Inserted %d slots for %s", len(slots), booking_date)
+        # Only courts read on this page, so a court missing from it keeps its earlier slots
+        delete_stale_slots(court_ids, scrape_id, booking_date)
     except Exception as e:
-        logger.error("Bulk insert failed: %s", e)
-        for slot in slots:
-            try:
-                supabase.table("slots").insert([slot]).execute()
-            except Exception as ex:
-                logger.error("Single insert failed: %s", ex)
+        # The old rows are still there, so retrying the overlapping slots would only clash again
+        logger.error("Failed to delete stale slots for %s: %s", club["name"], e)
+        return written
+    if overlapping:
+        # These clashed with slots from an earlier scrape, which are gone now
+        retried, overlapping, _ = insert_slots(overlapping)
+        written += retried
+        if overlapping:
+            logger.warning("Skipped %d slots overlapping existing ones for %s", len(overlapping), club["name"])
+    logger.info("Wrote %d slots for %s on %s", written, club["name"], booking_date)
+    return written
 
-def init_driver():
+def build_chrome_options():
     options = Options()
     options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
+    for flag in CHROME_LEAN_FLAGS:
+        options.add_argument(flag)
+    options.add_experimental_option("prefs", BLOCKED_CONTENT_PREFS)
+    # driver.get returns at DOMContentLoaded; the explicit grid waits cover the rest
+    options.page_load_strategy = "eager"
 
     # This is the key line for Render/Chromium setup:
     options.binary_location = "/usr/bin/chromium"
+    return options
 
-    # Use webdriver-manager to fetch a matching driver
-    from webdriver_manager.chrome import ChromeDriverManager
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=options)
+CHROME_OPTIONS = build_chrome_options()
 
-def scrape_club(club, scrape_id, booking_date):
-    driver = init_driver()
-    slots = []
+def init_driver():
+    global _chromedriver_path
+    # Use webdriver-manager to fetch a matching driver, once per process
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            _chromedriver_path = ChromeDriverManager().install()
+    service = Service(_chromedriver_path)
+    options = CHROME_OPTIONS
+    profile_dir = None
+    if CHROME_PROFILE_DIR:
+        # Every session needs its own profile, so only these two flags differ between drivers
+        profile_dir = tempfile.mkdtemp(prefix="chrome-", dir=CHROME_PROFILE_DIR)
+        options = copy.deepcopy(CHROME_OPTIONS)
+        options.add_argument(f"--user-data-dir={profile_dir}")
+        options.add_argument(f"--disk-cache-dir={profile_dir}/cache")
+    try:
+        driver = webdriver.Chrome(service=service, options=options)
+    except Exception:
+        remove_profile(profile_dir)
+        raise
+    driver.profile_dir = profile_dir
     try:
-        logger.info("Scraping %s", club["url"])
-        driver.get(club["url"])
-        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.border-b")))
+        # A hung load raises instead of blocking the thread, and the pool then recycles the driver
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    except Exception:
+        quit_driver(driver)
+        raise
+    return driver
 
-        court_rows = driver.find_elements(By.CSS_SELECTOR, "div.border-b")
-        logger.info("Found %d court rows", len(court_rows))
+class DriverPool:
+    # Keeps up to `size` Chrome sessions alive and lends them out one club at a time
 
-        for index, row in enumerate(court_rows):
+    def __init__(self, size, max_pages=MAX_PAGES_PER_DRIVER):
+        self.max_pages = max_pages
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._live = set()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lease(self):
+        with self._slots:
+            driver, pages = self._acquire()
+            broken = False
             try:
-                court_name = f"Court {index+1}"
-                name_el = row.find_element(By.CSS_SELECTOR, "div.font-medium")
-                court_name = name_el.text.strip() or court_name
-
-                court_id = ensure_court_exists(club["id"], court_name)
-                slot_elements = row.find_elements(By.CSS_SELECTOR, "div[data-start-hour][data-end-hour]")
-
-                for el in slot_elements:
-                    start = el.get_attribute("data-start-hour")
-                    end = el.get_attribute("data-end-hour")
-                    slots.append({
-                        "court_id": court_id,
-                        "booking_date": booking_date,
-                        "start_time": f"{start}:00",
-                        "end_time": f"{end}:00",
-                        "duration_minutes": (int(end.split(":")[0]) - int(start.split(":")[0])) * 60,
-                        "availability": True,
-                        "scrape_id": scrape_id,
-                        "scrape_timestamp": datetime.now(timezone.utc).isoformat()
-                    })
-
-            except Exception as e:
-                logger.warning("Court row error: %s", e)
+                yield driver
+            except BROKEN_SESSION_ERRORS:
+                # Don't hand a possibly broken session to the next club
+                broken = True
+                raise
+            finally:
+                # Long-lived Chrome sessions slowly leak memory, so start fresh every so often
+                if broken or pages + 1 >= self.max_pages:
+                    self._retire(driver)
+                else:
+                    self._idle.put((driver, pages + 1))
+
+    def warm(self):
+        # Starts a driver ahead of time if none is idle, without counting it as a page
+        try:
+            with self._slots:
+                self._idle.put(self._acquire())
+        except Exception as e:
+            logger.warning("Could not pre-start a driver: %s", e)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        driver = init_driver()
+        with self._lock:
+            self._live.add(driver)
+        return driver, 0
+
+    def _retire(self, driver):
+        with self._lock:
+            self._live.discard(driver)
+        quit_driver(driver)
+
+    def shutdown(self):
+        with self._lock:
+            drivers = list(self._live)
+            self._live.clear()
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for driver in drivers:
+            quit_driver(driver)
+
+def quit_driver(driver):
+    # quit() swallows its own errors, so check that chromedriver really exited
+    driver.quit()
+    process = driver.service.process
+    if process and process.poll() is None:
+        logger.warning("chromedriver still running after quit, killing it")
+        process.kill()
+    remove_profile(driver.profile_dir)
+
+def remove_profile(profile_dir):
+    if profile_dir:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+def handle_sigterm(signum, frame):
+    # SIGTERM skips atexit by default, which would leave Chrome processes behind
+    driver_pool.shutdown()
+    raise SystemExit(128 + signum)
+
+def install_shutdown_hooks():
+    # Called by the entry points rather than at import, so importing this module leaves signals alone
+    atexit.register(driver_pool.shutdown)
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+driver_pool = DriverPool(MAX_BROWSERS)
+
+def wait_for_stable_slots(driver, timeout=10):
+    last_count = [-1]
+
+    def stable(d):
+        count = d.execute_script(SLOT_COUNT_JS)
+        settled = count > 0 and count == last_count[0]
+        last_count[0] = count
+        return settled
 
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.25).until(stable)
+    except TimeoutException:
+        logger.warning("Slot count did not settle within %ds, reading current grid", timeout)
+
+def read_court_rows(driver, club):
+    logger.info("Scraping %s", club["url"])
+    driver.get(club["url"])
+    try:
+        WebDriverWait(driver, 30, poll_frequency=0.25).until(EC.presence_of_element_located(COURT_ROW_LOCATOR))
+    except TimeoutException:
+        # The page loaded but never showed a grid; the browser is fine and a retry would wait just as long
+        logger.warning("No court grid on %s", club["url"])
+        return []
+    wait_for_stable_slots(driver)
+
+    court_rows = driver.execute_script(COURT_ROWS_JS)
+    logger.info("Found %d court rows", len(court_rows))
+    return court_rows
+
+def build_club_slots(club, court_rows, scrape_id, booking_date):
+    slots = []
+    named_rows = [row for row in court_rows if row["name"] is not None]
+    if len(named_rows) < len(court_rows):
+        logger.warning("Skipping %d court rows with no name element", len(court_rows) - len(named_rows))
+
+    court_ids = ensure_courts_exist(club["id"], [row["name"] for row in named_rows])
+    intervals = {}
+    for row in named_rows:
+        court_intervals = intervals.setdefault(court_ids[row["name"]], [])
+        for start, end in row["hours"]:
+            interval = to_interval(start, end)
+            if interval is None:
+                logger.warning("Skipping slot with unreadable hours %r-%r on %s", start, end, row["name"])
+                continue
+            court_intervals.append(interval)
+
+    scrape_timestamp = datetime.now(timezone.utc).isoformat()
+    for court_id, court_intervals in intervals.items():
+        for start_min, end_min in merge_intervals(court_intervals):
+            slots.append({
+                "court_id": court_id,
+                "booking_date": booking_date,
+                "start_time": format_minutes(start_min),
+                "end_time": format_minutes(end_min),
+                "duration_minutes": end_min - start_min,
+                "availability": True,
+                "scrape_id": scrape_id,
+                "scrape_timestamp": scrape_timestamp
+            })
+    return slots, list(court_ids.values())
+
+def scrape_club(club):
+    # Only the page read holds the browser; court lookups and inserts happen afterwards
+    for attempt in range(1, SCRAPE_ATTEMPTS + 1):
+        try:
+            with driver_pool.lease() as driver:
+                court_rows = read_court_rows(driver, club)
+                driver.delete_all_cookies()
+            return court_rows
+        except Exception as e:
+            logger.error("Failed to scrape %s (attempt %d/%d): %s", club["name"], attempt, SCRAPE_ATTEMPTS, e)
+    return None
+
+def save_club(club, court_rows, scrape_id, booking_date):
+    try:
+        slots, court_ids = build_club_slots(club, court_rows, scrape_id, booking_date)
     except Exception as e:
-        logger.error("Failed to scrape %s: %s", club["name"], e)
-    finally:
-        driver.quit()
-    return slots
+        logger.error("Failed to resolve courts for %s: %s", club["name"], e)
+        return 0
+    store_club_slots(club, slots, court_ids, scrape_id, booking_date)
+    return len(slots)
+
+async def scrape_clubs(clubs, scrape_id, booking_date):
+    # Selenium is blocking, so clubs run on the browser threads, one pooled driver each
+    loop = asyncio.get_running_loop()
+
+    async def scrape_and_insert(club):
+        court_rows = await loop.run_in_executor(browser_executor, scrape_club, club)
+        if court_rows is None:
+            # A failed scrape leaves the club's previous slots untouched
+            return 0
+        # Store off the browser thread so it can start on the next club meanwhile
+        return await asyncio.to_thread(save_club, club, court_rows, scrape_id, booking_date)
+
+    counts = await asyncio.gather(*(scrape_and_insert(club) for club in clubs))
+    return sum(counts)
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--refresh", action="store_true", help="ignore the on-disk club and court cache")
     args = parser.parse_args()
 
-    scrape_id = create_scrape_run()
     booking_date = datetime.now().date().isoformat()
-    clubs = fetch_clubs()
-    logger.info("Found %d clubs", len(clubs))
-    to_process = clubs[:args.limit] if args.limit else clubs
+    scrape_id = str(uuid.uuid4())
+    # The run row only has to exist before the first slot insert, so write it while clubs load
+    with ThreadPoolExecutor(max_workers=1) as run_writer:
+        run_created = run_writer.submit(create_scrape_run, scrape_id, booking_date)
+        clubs = fetch_clubs(refresh=args.refresh)
+        logger.info("Found %d clubs", len(clubs))
+        to_process = clubs[:args.limit] if args.limit else clubs
+        # Chrome startup overlaps the scrape run insert
+        for _ in range(min(MAX_BROWSERS, len(to_process))):
+            browser_executor.submit(driver_pool.warm)
+        cache_courts(to_process)
+        run_created.result()
 
-    all_slots = []
-    for club in to_process:
-        all_slots.extend(scrape_club(club, scrape_id, booking_date))
+    total_slots = asyncio.run(scrape_clubs(to_process, scrape_id, booking_date))
 
-    logger.info("Total extracted slots: %d", len(all_slots))
-    insert_slots(all_slots, booking_date)
+    logger.info("Total extracted slots: %d", total_slots)
     logger.info("Scraping completed.")
 
 if __name__ == "__main__":
+    install_shutdown_hooks()
     main()
@@ -0,0 +1,8 @@
+import os
+import sys
+from pathlib import Path
+
+# padelv2 builds its Supabase client at import; dummy credentials are enough since tests never hit the network
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test.test.test")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,374 @@
+import pytest
+from postgrest.exceptions import APIError
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+import padelv2
+
+CLUB = {"id": "club", "name": "Club", "url": "https://example.test/club"}
+
+
+# Hour parsing and formatting
+
+@pytest.mark.parametrize("hour, minutes", [("07:00", 420), ("7:30", 450), ("19:05", 1145), ("00:00", 0)])
+def test_to_minutes(hour, minutes):
+    assert padelv2.to_minutes(hour) == minutes
+
+
+def test_format_minutes_wraps_after_midnight():
+    assert padelv2.format_minutes(450) == "07:30:00"
+    assert padelv2.format_minutes(1440) == "00:00:00"
+    assert padelv2.format_minutes(1500) == "01:00:00"
+
+
+@pytest.mark.parametrize("hour, minutes", [("7", 420), ("07", 420), ("0", 0)])
+def test_to_minutes_accepts_bare_hours(hour, minutes):
+    assert padelv2.to_minutes(hour) == minutes
+
+
+@pytest.mark.parametrize("hour", ["09:30:00", "9.5", "", None, "abc"])
+def test_to_minutes_rejects_unexpected_values(hour):
+    assert padelv2.to_minutes(hour) is None
+
+
+def test_to_interval_rolls_past_midnight():
+    assert padelv2.to_interval("9", "10:30") == (540, 630)
+    assert padelv2.to_interval("23:00", "1:00") == (1380, 1500)
+    assert padelv2.to_interval("22", "0") == (1320, 1440)
+    assert padelv2.to_interval("9", "9.5") is None
+
+
+# Driver pool
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+
+    def get(self, url):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+
+@pytest.fixture
+def drivers(mocker):
+    started = []
+    quit = []
+
+    def start():
+        started.append(FakeDriver(len(started)))
+        return started[-1]
+
+    mocker.patch.object(padelv2, "init_driver", side_effect=start)
+    mocker.patch.object(padelv2, "quit_driver", side_effect=quit.append)
+    return started, quit
+
+
+def test_lease_reuses_a_healthy_driver(drivers):
+    started, quit = drivers
+    pool = padelv2.DriverPool(1, max_pages=10)
+
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        pass
+
+    assert first is second
+    assert len(started) == 1
+    assert quit == []
+
+
+def test_lease_keeps_the_driver_after_a_non_browser_error(drivers):
+    started, quit = drivers
+    pool = padelv2.DriverPool(1, max_pages=10)
+
+    with pytest.raises(ValueError):
+        with pool.lease():
+            raise ValueError("bad hour")
+    with pool.lease():
+        pass
+
+    assert len(started) == 1
+    assert quit == []
+
+
+@pytest.mark.parametrize("error", [WebDriverException("session deleted"), ConnectionRefusedError()])
+def test_lease_retires_a_broken_driver(drivers, error):
+    started, quit = drivers
+    pool = padelv2.DriverPool(1, max_pages=10)
+
+    with pytest.raises(type(error)):
+        with pool.lease():
+            raise error
+    with pool.lease():
+        pass
+
+    assert len(started) == 2
+    assert quit == [started[0]]
+
+
+def test_lease_recycles_a_driver_after_max_pages(drivers):
+    started, quit = drivers
+    pool = padelv2.DriverPool(1, max_pages=2)
+
+    for _ in range(3):
+        with pool.lease():
+            pass
+
+    assert len(started) == 2
+    assert quit == [started[0]]
+
+
+def test_shutdown_quits_idle_and_leased_drivers(drivers):
+    started, quit = drivers
+    pool = padelv2.DriverPool(2, max_pages=10)
+
+    with pool.lease():
+        with pool.lease():
+            pass
+    pool.shutdown()
+
+    assert sorted(d.number for d in quit) == [0, 1]
+
+
+def test_scrape_club_keeps_the_driver_and_skips_the_retry_when_no_grid_appears(drivers, mocker):
+    started, quit = drivers
+    mocker.patch.object(padelv2, "driver_pool", padelv2.DriverPool(1, max_pages=10))
+    wait = mocker.patch.object(padelv2, "WebDriverWait")
+    wait.return_value.until.side_effect = TimeoutException()
+
+    assert padelv2.scrape_club(CLUB) == []
+    assert wait.return_value.until.call_count == 1
+    assert len(started) == 1
+    assert quit == []
+
+
+# Driver cleanup
+
+def test_init_driver_quits_chrome_when_setup_fails(mocker):
+    mocker.patch.object(padelv2, "_chromedriver_path", "/usr/bin/chromedriver")
+    mocker.patch.object(padelv2, "Service")
+    chrome = mocker.patch.object(padelv2.webdriver, "Chrome")
+    chrome.return_value.execute_cdp_cmd.side_effect = WebDriverException("cdp")
+    quit = mocker.patch.object(padelv2, "quit_driver")
+
+    with pytest.raises(WebDriverException):
+        padelv2.init_driver()
+    quit.assert_called_once_with(chrome.return_value)
+
+
+@pytest.mark.parametrize("returncode, killed", [(None, True), (0, False)])
+def test_quit_driver_kills_a_chromedriver_that_outlives_quit(mocker, returncode, killed):
+    driver = mocker.Mock()
+    driver.service.process.poll.return_value = returncode
+
+    padelv2.quit_driver(driver)
+
+    driver.quit.assert_called_once()
+    assert driver.service.process.kill.called is killed
+
+
+# Interval merging
+
+def test_merge_intervals():
+    intervals = [(600, 660), (540, 600), (540, 600), (630, 690), (720, 780)]
+    assert padelv2.merge_intervals(intervals) == [[540, 690], [720, 780]]
+    assert padelv2.merge_intervals([]) == []
+
+
+def test_merge_intervals_across_midnight():
+    intervals = [padelv2.to_interval("22", "23"), padelv2.to_interval("23", "0"), padelv2.to_interval("23:30", "1")]
+    assert padelv2.merge_intervals(intervals) == [[1320, 1500]]
+
+
+# Court lookups
+
+@pytest.fixture
+def courts_table(mocker):
+    mocker.patch.dict(padelv2._court_ids, clear=True)
+    supabase = mocker.patch.object(padelv2, "supabase")
+    return supabase.table.return_value
+
+
+def test_ensure_courts_exist_uses_cached_ids(courts_table):
+    padelv2._court_ids[("club", "Court 1")] = "id-1"
+
+    assert padelv2.ensure_courts_exist("club", ["Court 1", "Court 1"]) == {"Court 1": "id-1"}
+    courts_table.upsert.assert_not_called()
+    courts_table.select.assert_not_called()
+
+
+def test_ensure_courts_exist_creates_new_courts(courts_table):
+    courts_table.upsert.return_value.execute.return_value.data = [{"id": "id-1", "name": "Court 1"}]
+
+    assert padelv2.ensure_courts_exist("club", ["Court 1"]) == {"Court 1": "id-1"}
+    rows = courts_table.upsert.call_args.args[0]
+    assert [(row["club_id"], row["name"]) for row in rows] == [("club", "Court 1")]
+    courts_table.select.assert_not_called()
+
+
+def test_ensure_courts_exist_looks_up_courts_the_upsert_skipped(courts_table):
+    courts_table.upsert.return_value.execute.return_value.data = [{"id": "id-2", "name": "Court 2"}]
+    lookup = courts_table.select.return_value.eq.return_value.in_
+    lookup.return_value.execute.return_value.data = [{"id": "id-1", "name": "Court 1"}]
+
+    assert padelv2.ensure_courts_exist("club", ["Court 1", "Court 2"]) == {"Court 1": "id-1", "Court 2": "id-2"}
+    lookup.assert_called_once_with("name", ["Court 1"])
+    assert padelv2._court_ids[("club", "Court 1")] == "id-1"
+
+
+# Driver warm-up
+
+def test_warm_starts_an_idle_driver_without_counting_a_page(drivers):
+    started, quit = drivers
+    pool = padelv2.DriverPool(1, max_pages=1)
+
+    pool.warm()
+    assert len(started) == 1
+    with pool.lease() as driver:
+        pass
+
+    assert driver is started[0]
+    assert quit == [started[0]]
+
+
+def test_warm_failure_is_logged_and_frees_the_slot(drivers, mocker):
+    started, quit = drivers
+    mocker.patch.object(padelv2, "init_driver", side_effect=[WebDriverException("no chrome"), FakeDriver(9)])
+    pool = padelv2.DriverPool(1)
+
+    pool.warm()
+    with pool.lease() as driver:
+        pass
+
+    assert driver.number == 9
+
+
+# Batched slot writes
+
+def overlap_error():
+    return APIError({"code": "23P01", "message": "conflicting key value violates exclusion constraint \"slots_no_overlap\""})
+
+
+def fake_upsert(bad_rows, calls):
+    def upsert(rows):
+        calls.append(list(rows))
+        if any(row in bad_rows for row in rows):
+            raise overlap_error()
+        return len(rows)
+    return upsert
+
+
+def test_insert_batch_sets_aside_only_overlapping_rows(mocker):
+    rows = [{"n": i} for i in range(8)]
+    calls = []
+    mocker.patch.object(padelv2, "upsert_slots", side_effect=fake_upsert([rows[5]], calls))
+    overlapping = []
+
+    assert padelv2.insert_batch(rows, overlapping) == 7
+    assert overlapping == [rows[5]]
+    # 8 -> 4+4 -> 2+2 -> 1+1, only following the half that contains the bad row
+    assert len(calls) == 7
+
+
+def test_insert_batch_with_two_bad_rows(mocker):
+    rows = [{"n": i} for i in range(8)]
+    calls = []
+    mocker.patch.object(padelv2, "upsert_slots", side_effect=fake_upsert([rows[0], rows[7]], calls))
+    overlapping = []
+
+    assert padelv2.insert_batch(rows, overlapping) == 6
+    assert overlapping == [rows[0], rows[7]]
+    assert len(calls) == 11
+
+
+def test_insert_batch_recognises_the_postgres_message(mocker):
+    error = Exception("conflicting key value violates exclusion constraint \"slots_no_overlap\"")
+    mocker.patch.object(padelv2, "upsert_slots", side_effect=error)
+    overlapping = []
+
+    assert padelv2.insert_batch([{"n": 0}], overlapping) == 0
+    assert overlapping == [{"n": 0}]
+
+
+def test_insert_batch_reraises_other_errors(mocker):
+    upsert = mocker.patch.object(padelv2, "upsert_slots", side_effect=APIError({"code": "57014", "message": "timeout"}))
+
+    with pytest.raises(APIError):
+        padelv2.insert_batch([{"n": 0}, {"n": 1}], [])
+    assert upsert.call_count == 1
+
+
+def test_insert_slots_reports_failed_batches(mocker):
+    mocker.patch.object(padelv2, "BATCH_SIZE", 2)
+    upsert = mocker.patch.object(padelv2, "upsert_slots", side_effect=[2, Exception("timeout"), 1])
+
+    written, overlapping, complete = padelv2.insert_slots([{"n": i} for i in range(5)])
+
+    assert (written, overlapping, complete) == (3, [], False)
+    assert upsert.call_count == 3
+
+
+# Storing a club's slots
+
+@pytest.fixture
+def slot_writes(mocker):
+    upsert = mocker.patch.object(padelv2, "upsert_slots", side_effect=len)
+    delete = mocker.patch.object(padelv2, "delete_stale_slots")
+    return upsert, delete
+
+
+def test_store_club_slots_replaces_the_day(slot_writes):
+    upsert, delete = slot_writes
+
+    assert padelv2.store_club_slots(CLUB, [{"n": 0}, {"n": 1}], ["court-a"], "run", "2026-10-15") == 2
+    delete.assert_called_once_with(["court-a"], "run", "2026-10-15")
+
+
+def test_store_club_slots_keeps_earlier_slots_after_an_empty_scrape(slot_writes):
+    upsert, delete = slot_writes
+
+    assert padelv2.store_club_slots(CLUB, [], ["court-a"], "run", "2026-10-15") == 0
+    upsert.assert_not_called()
+    delete.assert_not_called()
+
+
+def test_store_club_slots_keeps_earlier_slots_when_a_batch_fails(slot_writes):
+    upsert, delete = slot_writes
+    upsert.side_effect = Exception("timeout")
+
+    assert padelv2.store_club_slots(CLUB, [{"n": 0}], ["court-a"], "run", "2026-10-15") == 0
+    delete.assert_not_called()
+
+
+def test_store_club_slots_retries_overlaps_after_the_delete(slot_writes):
+    upsert, delete = slot_writes
+    upsert.side_effect = [overlap_error(), 1]
+
+    assert padelv2.store_club_slots(CLUB, [{"n": 0}], ["court-a"], "run", "2026-10-15") == 1
+    delete.assert_called_once()
+    assert upsert.call_count == 2
+
+
+def test_store_club_slots_skips_the_retry_when_the_delete_fails(slot_writes):
+    upsert, delete = slot_writes
+    upsert.side_effect = [overlap_error(), 1]
+    delete.side_effect = Exception("connection reset")
+
+    assert padelv2.store_club_slots(CLUB, [{"n": 0}], ["court-a"], "run", "2026-10-15") == 0
+    assert upsert.call_count == 1
+
+
+def test_build_club_slots_returns_only_the_courts_on_the_page(mocker):
+    mocker.patch.dict(padelv2._court_ids, {("club", "Old court"): "id-old"}, clear=True)
+    mocker.patch.object(padelv2, "ensure_courts_exist", return_value={"Court 1": "id-1", "Court 2": "id-2"})
+    rows = [
+        {"name": "Court 1", "hours": [["9", "10"], ["10", "11"]]},
+        {"name": "Court 2", "hours": []},
+        {"name": None, "hours": [["9", "10"]]},
+    ]
+
+    slots, court_ids = padelv2.build_club_slots(CLUB, rows, "run", "2026-10-15")
+
+    assert court_ids == ["id-1", "id-2"]
+    assert [(s["court_id"], s["start_time"], s["end_time"]) for s in slots] == [("id-1", "09:00:00", "11:00:00")]